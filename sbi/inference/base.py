@@ -2,7 +2,6 @@
 # under the Affero General Public License v3, see <https://www.gnu.org/licenses/>.
 
 from abc import ABC, abstractmethod
-from copy import deepcopy
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union, cast
@@ -55,7 +54,10 @@ def infer(
         method: What inference method to use. Either of SNPE, SNLE or SNRE.
         num_simulations: Number of simulation calls. More simulations means a longer
             runtime, but a better posterior estimate.
-        num_workers: Number of parallel workers to use for simulations.
+        num_workers: Number of parallel workers to use for simulations. With a
+            single worker, parameters are simulated in about 100 large batches: a
+            vectorized simulator is called only few times, while the progress bar
+            is still updated during the simulations.
 
     Returns: Posterior over parameters conditional on observations (amortized).
     """
@@ -70,11 +72,15 @@ def infer(
     simulator, prior = prepare_for_sbi(simulator, prior)
 
     inference = method_fun(prior)
+    # `prepare_for_sbi` ensures that the simulator handles batches. Without multiple
+    # workers to distribute batches to, parameters are simulated in few large batches,
+    # of which each updates the progress bar.
     theta, x = simulate_for_sbi(
         simulator=simulator,
         proposal=prior,
         num_simulations=num_simulations,
         num_workers=num_workers,
+        simulation_batch_size=max(1, num_simulations // 100) if num_workers == 1 else 1,
     )
     _ = inference.append_simulations(theta, x).train()
     posterior = inference.build_posterior()
@@ -257,6 +263,10 @@ class NeuralInference(ABC):
                 num_nans, num_infs, exclude_invalid_x, type(self).__name__, self._round
             )
 
+        # Indexing with the mask copies all data, only needed to drop invalid x.
+        if not exclude_invalid_x or num_nans + num_infs == 0:
+            return theta, x, prior_masks
+
         return theta[is_valid_x], x[is_valid_x], prior_masks[is_valid_x]
 
     @abstractmethod
@@ -303,24 +313,28 @@ class NeuralInference(ABC):
         num_examples = len(dataset)
 
         # Select random train and validation splits from (theta, x) pairs.
-        num_training_examples = int((1 - validation_fraction) * num_examples)
-        num_validation_examples = num_examples - num_training_examples
-
         if not resume_training:
+            num_training_examples = int((1 - validation_fraction) * num_examples)
             permuted_indices = torch.randperm(num_examples)
             self.train_indices, self.val_indices = (
                 permuted_indices[:num_training_examples],
                 permuted_indices[num_training_examples:],
             )
 
-        # Create training and validation loaders using a subset sampler.
+        # The batch sizes are limited by the actual split, which may have been created
+        # elsewhere, e.g. incrementally across rounds.
+        num_training_examples = len(self.train_indices)
+        num_validation_examples = len(self.val_indices)
+
+        # Create training and validation loaders using a subset sampler. The sampler
+        # indexes the dataset on the cpu, even if the indices live on the device.
         # Intentionally use dicts to define the default dataloader args
         # Then, use dataloader_kwargs to override (or add to) any of these defaults
         # https://stackoverflow.com/questions/44784577/in-method-call-args-how-to-override-keyword-argument-of-unpacked-dict
         train_loader_kwargs = {
             "batch_size": min(training_batch_size, num_training_examples),
             "drop_last": True,
-            "sampler": data.sampler.SubsetRandomSampler(self.train_indices),
+            "sampler": data.sampler.SubsetRandomSampler(self.train_indices.cpu()),
         }
         train_loader_kwargs = (
             dict(train_loader_kwargs, **dataloader_kwargs)
@@ -331,7 +345,7 @@ class NeuralInference(ABC):
             "batch_size": min(training_batch_size, num_validation_examples),
             "shuffle": False,
             "drop_last": True,
-            "sampler": data.sampler.SubsetRandomSampler(self.val_indices),
+            "sampler": data.sampler.SubsetRandomSampler(self.val_indices.cpu()),
         }
         val_loader_kwargs = (
             dict(val_loader_kwargs, **dataloader_kwargs)
@@ -363,7 +377,16 @@ class NeuralInference(ABC):
         if epoch == 0 or self._val_log_prob > self._best_val_log_prob:
             self._best_val_log_prob = self._val_log_prob
             self._epochs_since_last_improvement = 0
-            self._best_model_state_dict = deepcopy(neural_net.state_dict())
+            if epoch == 0:
+                # Allocate the snapshot once per training run: the net might have
+                # been rebuilt since the last call to `.train()`.
+                self._best_model_state_dict = {
+                    k: v.detach().clone() for k, v in neural_net.state_dict().items()
+                }
+            else:
+                # Copy into the existing snapshot instead of allocating a new one.
+                for k, v in neural_net.state_dict().items():
+                    self._best_model_state_dict[k].copy_(v)
         else:
             self._epochs_since_last_improvement += 1
 
@@ -2,18 +2,19 @@
 # under the Affero General Public License v3, see <https://www.gnu.org/licenses/>.
 
 from abc import ABC, abstractmethod
-from copy import deepcopy
 from math import ceil
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from warnings import warn
 
 import numpy as np
 import torch
+from joblib import Parallel, delayed
 from pyro.infer.mcmc import HMC, NUTS
 from pyro.infer.mcmc.api import MCMC
 from torch import Tensor, float32
 from torch import multiprocessing as mp
 from torch import nn, optim
+from tqdm.auto import tqdm
 
 from sbi import utils as utils
 from sbi.mcmc import (
@@ -24,11 +25,11 @@ from sbi.mcmc import (
     prior_init,
     sir,
 )
+from sbi.simulators.simutils import tqdm_joblib
 from sbi.types import Array, Shape
 from sbi.utils.sbiutils import check_dist_class
 from sbi.utils.torchutils import (
     BoxUniform,
-    ScalarFloat,
     atleast_2d_float32_tensor,
     ensure_theta_batched,
 )
@@ -68,6 +69,7 @@ class NeuralPosterior(ABC):
                 The following parameters are supported: `thin` to set the thinning
                 factor for the chain, `warmup_steps` to set the initial number of
                 samples to discard, `num_chains` for the number of chains,
+                `num_workers` for the number of parallel workers used by `slice_np`,
                 `init_strategy` for the initialisation strategy for chains; `prior`
                 will draw init locations from prior, whereas `sir` will use Sequential-
                 Importance-Resampling. Init strategies may have their own keywords
@@ -170,6 +172,7 @@ class NeuralPosterior(ABC):
                 The following parameters are supported: `thin` to set the thinning
                 factor for the chain, `warmup_steps` to set the initial number of
                 samples to discard, `num_chains` for the number of chains,
+                `num_workers` for the number of parallel workers used by `slice_np`,
                 `init_strategy` for the initialisation strategy for chains; `prior`
                 will draw init locations from prior, whereas `sir` will use Sequential-
                 Importance-Resampling using `init_strategy_num_candidates` to find init
@@ -292,6 +295,7 @@ class NeuralPosterior(ABC):
                 The following parameters are supported: `thin` to set the thinning
                 factor for the chain, `warmup_steps` to set the initial number of
                 samples to discard, `num_chains` for the number of chains,
+                `num_workers` for the number of parallel workers used by `slice_np`,
                 `init_strategy` for the initialisation strategy for chains; `prior`
                 will draw init locations from prior, whereas `sir` will use Sequential-
                 Importance-Resampling using `init_strategy_num_candidates` to find init
@@ -326,6 +330,7 @@ class NeuralPosterior(ABC):
         thin: int = 10,
         warmup_steps: int = 20,
         num_chains: Optional[int] = 1,
+        num_workers: int = 1,
         show_progress_bars: bool = True,
         **kwargs,
     ) -> Tensor:
@@ -348,6 +353,8 @@ class NeuralPosterior(ABC):
                 sample will be returned, until a total of `num_samples`.
             warmup_steps: Initial number of samples to discard.
             num_chains: Whether to sample in parallel. If None, use all but one CPU.
+            num_workers: Number of CPU cores used to run the chains of `slice_np` in
+                parallel, one chain per job.
             show_progress_bars: Whether to show a progressbar during sampling.
             kwargs: Absorbs passed but unused arguments. E.g. in
                 `DirectPosterior.sample()` we pass `mcmc_parameters` which might
@@ -370,6 +377,7 @@ class NeuralPosterior(ABC):
                     thin=thin,
                     warmup_steps=warmup_steps,
                     vectorized=(mcmc_method == "slice_np_vectorized"),
+                    num_workers=num_workers,
                     show_progress_bars=show_progress_bars,
                 )
             elif mcmc_method in ("hmc", "nuts", "slice"):
@@ -396,6 +404,7 @@ class NeuralPosterior(ABC):
         thin: int,
         warmup_steps: int,
         vectorized: bool = False,
+        num_workers: int = 1,
         show_progress_bars: bool = True,
     ) -> Tensor:
         """
@@ -403,12 +412,15 @@ class NeuralPosterior(ABC):
 
         Args:
             num_samples: Desired number of samples.
-            potential_function: A callable **class**.
+            potential_function: A callable **class**. A class, but not a function,
+                is picklable for joblib to send it to the workers.
             initial_params: Initial parameters for MCMC chain.
             thin: Thinning (subsampling) factor.
             warmup_steps: Initial number of samples to discard.
             vectorized: Whether to use a vectorized implementation of
                 the Slice sampler (still experimental).
+            num_workers: Number of CPU cores used to run the chains in parallel. Not
+                used by the vectorized sampler, which evaluates all chains at once.
             show_progress_bars: Whether to show a progressbar during sampling;
                 can only be turned off for vectorized sampler.
 
@@ -417,19 +429,34 @@ class NeuralPosterior(ABC):
         num_chains = initial_params.shape[0]
         dim_samples = initial_params.shape[1]
 
-        if not vectorized:  # Sample all chains sequentially
-            all_samples = []
-            for c in range(num_chains):
-                posterior_sampler = SliceSampler(
-                    utils.tensor2numpy(initial_params[c, :]).reshape(-1),
-                    lp_f=potential_function,
-                    thin=thin,
-                    verbose=show_progress_bars,
+        if not vectorized:  # Sample chains sequentially or one chain per worker.
+            num_samples_per_chain = ceil(num_samples / num_chains)
+            # Seeds are drawn in the main process such that results are reproducible
+            # given the global numpy seed and do not depend on the number of workers.
+            seeds = np.random.randint(0, 2 ** 31 - 1, num_chains)
+
+            with tqdm_joblib(
+                tqdm(
+                    range(num_chains),
+                    disable=not show_progress_bars or num_workers == 1,
+                    desc=f"Running {num_chains} MCMC chains with {num_workers} "
+                    f"workers.",
+                    total=num_chains,
                 )
-                if warmup_steps > 0:
-                    posterior_sampler.gen(int(warmup_steps))
-                all_samples.append(
-                    posterior_sampler.gen(ceil(num_samples / num_chains))
+            ):
+                all_samples = Parallel(n_jobs=num_workers)(
+                    delayed(_run_slice_np_chain)(
+                        utils.tensor2numpy(initial_params[c, :]).reshape(-1),
+                        potential_function,
+                        num_samples_per_chain,
+                        thin,
+                        warmup_steps,
+                        seed,
+                        # Progress bars of the workers would interleave.
+                        show_progress_bars and num_workers == 1,
+                        num_workers > 1,
+                    )
+                    for c, seed in zip(range(num_chains), seeds)
                 )
             all_samples = np.stack(all_samples).astype(np.float32)
             samples = torch.from_numpy(all_samples)  # chains x samples x dim
@@ -547,6 +574,7 @@ class NeuralPosterior(ABC):
                 The following parameters are supported: `thin` to set the thinning
                 factor for the chain, `warmup_steps` to set the initial number of
                 samples to discard, `num_chains` for the number of chains,
+                `num_workers` for the number of parallel workers used by `slice_np`,
                 `init_strategy` for the initialisation strategy for chains; `prior`
                 will draw init locations from prior, whereas `sir` will use Sequential-
                 Importance-Resampling using `init_strategy_num_candidates` to find init
@@ -971,6 +999,55 @@ class NeuralPosterior(ABC):
         self.__dict__ = state_dict
 
 
+def _run_slice_np_chain(
+    initial_params: np.ndarray,
+    potential_function: Callable,
+    num_samples: int,
+    thin: int,
+    warmup_steps: int,
+    seed: int,
+    show_progress_bars: bool,
+    single_threaded: bool,
+) -> np.ndarray:
+    """Return samples of a single `slice_np` chain.
+
+    Defined at module level such that joblib can send it to its workers.
+
+    Args:
+        initial_params: Initial parameters of the chain.
+        potential_function: Potential function used for MCMC sampling.
+        num_samples: Number of samples to return after warmup.
+        thin: Thinning (subsampling) factor.
+        warmup_steps: Initial number of samples to discard.
+        seed: Seed of the random number generator of the chain. The global numpy
+            random state is not affected.
+        show_progress_bars: Whether to show a progressbar during sampling.
+        single_threaded: Whether to restrict torch to a single thread. Used when
+            several chains run in parallel to avoid oversubscription of CPU cores.
+
+    Returns: Array of shape (num_samples, shape_of_single_theta).
+    """
+    rng = np.random.RandomState(seed)
+    # Workers are reused by joblib, restore the number of threads for later tasks.
+    num_threads = torch.get_num_threads()
+    if single_threaded:
+        torch.set_num_threads(1)
+
+    try:
+        posterior_sampler = SliceSampler(
+            initial_params,
+            lp_f=potential_function,
+            thin=thin,
+            verbose=show_progress_bars,
+        )
+        if warmup_steps > 0:
+            posterior_sampler.gen(int(warmup_steps), rng=rng)
+
+        return posterior_sampler.gen(num_samples, rng=rng)
+    finally:
+        torch.set_num_threads(num_threads)
+
+
 class ConditionalPotentialFunctionProvider:
     """
     Wraps the potential functions to allow for sampling from the conditional posterior.
@@ -1012,25 +1089,27 @@ class ConditionalPotentialFunctionProvider:
         else:
             return self.np_potential
 
-    def np_potential(self, theta: np.ndarray) -> ScalarFloat:
+    def np_potential(self, theta: np.ndarray) -> Tensor:
         r"""
         Return conditional posterior log-probability or $-\infty$ if outside prior.
 
         Args:
-            theta: Free parameters $\theta_i$, batch dimension 1.
+            theta: Free parameters $\theta_i$, of shape `(num_chains, len(dims))` or
+                `(len(dims),)` for a single chain.
 
         Returns:
             Conditional posterior log-probability $\log(p(\theta_i|\theta_j, x))$,
             masked outside of prior.
         """
-        theta = torch.as_tensor(theta, dtype=torch.float32)
+        theta = ensure_theta_batched(torch.as_tensor(theta, dtype=torch.float32))
 
-        theta_condition = deepcopy(self.condition)
+        # `repeat` allocates the full parameter sets for the batch, no further copy of
+        # the condition is needed.
+        theta_condition = self.condition.repeat(theta.shape[0], 1)
         theta_condition[:, self.dims_to_sample] = theta
 
-        return self.potential_fn_provider.np_potential(
-            utils.tensor2numpy(theta_condition)
-        )
+        # The potential accepts tensors, avoid a round trip through numpy.
+        return self.potential_fn_provider.np_potential(theta_condition)
 
     def pyro_potential(self, theta: Dict[str, Tensor]) -> Tensor:
         r"""
@@ -1046,7 +1125,7 @@ class ConditionalPotentialFunctionProvider:
 
         theta = next(iter(theta.values()))
 
-        theta_condition = deepcopy(self.condition)
+        theta_condition = self.condition.clone()
         theta_condition[:, self.dims_to_sample] = theta
 
         return self.potential_fn_provider.pyro_potential({"": theta_condition})
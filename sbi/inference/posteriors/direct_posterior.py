@@ -68,6 +68,7 @@ class DirectPosterior(NeuralPosterior):
                 The following parameters are supported: `thin` to set the thinning
                 factor for the chain, `warmup_steps` to set the initial number of
                 samples to discard, `num_chains` for the number of chains,
+                `num_workers` for the number of parallel workers used by `slice_np`,
                 `init_strategy` for the initialisation strategy for chains; `prior`
                 will draw init locations from prior, whereas `sir` will use Sequential-
                 Importance-Resampling using `init_strategy_num_candidates` to find init
@@ -312,6 +313,7 @@ class DirectPosterior(NeuralPosterior):
                 The following parameters are supported: `thin` to set the thinning
                 factor for the chain, `warmup_steps` to set the initial number of
                 samples to discard, `num_chains` for the number of chains,
+                `num_workers` for the number of parallel workers used by `slice_np`,
                 `init_strategy` for the initialisation strategy for chains; `prior`
                 will draw init locations from prior, whereas `sir` will use Sequential-
                 Importance-Resampling using `init_strategy_num_candidates` to find init
@@ -406,6 +408,7 @@ class DirectPosterior(NeuralPosterior):
                 The following parameters are supported: `thin` to set the thinning
                 factor for the chain, `warmup_steps` to set the initial number of
                 samples to discard, `num_chains` for the number of chains,
+                `num_workers` for the number of parallel workers used by `slice_np`,
                 `init_strategy` for the initialisation strategy for chains; `prior`
                 will draw init locations from prior, whereas `sir` will use Sequential-
                 Importance-Resampling using `init_strategy_num_candidates` to find init
@@ -551,7 +554,7 @@ class PotentialFunctionProvider:
             target_log_prob = self.posterior_nn.log_prob(
                 inputs=theta.to(self.x.device),
                 context=x_repeated,
-            )
+            ).cpu()
             in_prior_support = within_support(self.prior, theta)
             target_log_prob[~in_prior_support] = -float("Inf")
 
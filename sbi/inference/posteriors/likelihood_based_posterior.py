@@ -11,7 +11,7 @@ from torch import Tensor, nn
 from sbi.inference.posteriors.base_posterior import NeuralPosterior
 from sbi.types import Shape
 from sbi.utils import del_entries
-from sbi.utils.torchutils import ScalarFloat, ensure_theta_batched, ensure_x_batched
+from sbi.utils.torchutils import ensure_theta_batched
 
 
 class LikelihoodBasedPosterior(NeuralPosterior):
@@ -48,6 +48,7 @@ class LikelihoodBasedPosterior(NeuralPosterior):
                 The following parameters are supported: `thin` to set the thinning
                 factor for the chain, `warmup_steps` to set the initial number of
                 samples to discard, `num_chains` for the number of chains,
+                `num_workers` for the number of parallel workers used by `slice_np`,
                 `init_strategy` for the initialisation strategy for chains; `prior`
                 will draw init locations from prior, whereas `sir` will use Sequential-
                 Importance-Resampling using `init_strategy_num_candidates` to find init
@@ -124,6 +125,7 @@ class LikelihoodBasedPosterior(NeuralPosterior):
                 The following parameters are supported: `thin` to set the thinning
                 factor for the chain, `warmup_steps` to set the initial number of
                 samples to discard, `num_chains` for the number of chains,
+                `num_workers` for the number of parallel workers used by `slice_np`,
                 `init_strategy` for the initialisation strategy for chains; `prior`
                 will draw init locations from prior, whereas `sir` will use Sequential-
                 Importance-Resampling using `init_strategy_num_candidates` to find init
@@ -139,14 +141,23 @@ class LikelihoodBasedPosterior(NeuralPosterior):
 
         self.net.eval()
 
+        # The potential function is only specialized here, when sampling is requested,
+        # such that it uses the most recent net and `x`.
         potential_fn_provider = PotentialFunctionProvider()
+        potential_fn = potential_fn_provider(self._prior, self.net, x, mcmc_method)
+        # The init strategies need the numpy potential, reuse it if already built.
+        if mcmc_method in ("slice", "hmc", "nuts"):
+            init_potential_fn = potential_fn_provider(
+                self._prior, self.net, x, "slice_np"
+            )
+        else:
+            init_potential_fn = potential_fn
+
         samples = self._sample_posterior_mcmc(
             num_samples=num_samples,
-            potential_fn=potential_fn_provider(self._prior, self.net, x, mcmc_method),
+            potential_fn=potential_fn,
             init_fn=self._build_mcmc_init_fn(
-                self._prior,
-                potential_fn_provider(self._prior, self.net, x, "slice_np"),
-                **mcmc_parameters,
+                self._prior, init_potential_fn, **mcmc_parameters,
             ),
             mcmc_method=mcmc_method,
             show_progress_bars=show_progress_bars,
@@ -195,6 +206,7 @@ class LikelihoodBasedPosterior(NeuralPosterior):
                 The following parameters are supported: `thin` to set the thinning
                 factor for the chain, `warmup_steps` to set the initial number of
                 samples to discard, `num_chains` for the number of chains,
+                `num_workers` for the number of parallel workers used by `slice_np`,
                 `init_strategy` for the initialisation strategy for chains; `prior`
                 will draw init locations from prior, whereas `sir` will use Sequential-
                 Importance-Resampling using `init_strategy_num_candidates` to find init
@@ -314,36 +326,74 @@ class PotentialFunctionProvider:
         """
         self.likelihood_nn = likelihood_nn
         self.prior = prior
-        self.x = x
+        # The net is evaluated on the device it lives on. `x` is moved there and
+        # given a batch dimension once, such that only theta has to be transferred
+        # in every MCMC step.
+        self.device = next(likelihood_nn.parameters()).device
+        self.x = x.to(self.device)
+        self.x_batched = self.x.reshape(1, -1)
+        # Pinned host buffer to stage theta for transfers to the GPU, see `_to_device`.
+        self._theta_buffer = None
 
         if mcmc_method in ("slice", "hmc", "nuts"):
             return self.pyro_potential
         else:
             return self.np_potential
 
-    def np_potential(self, theta: np.array) -> ScalarFloat:
+    def np_potential(self, theta: np.ndarray) -> Tensor:
         r"""Return posterior log prob. of theta $p(\theta|x)$"
 
+        The likelihood of all parameter sets in the batch is evaluated with a single
+        forward pass of the neural net, such that vectorized samplers can evaluate all
+        chains at once.
+
         Args:
-            theta: Parameters $\theta$, batch dimension 1.
+            theta: Parameters $\theta$ of shape `(num_chains, dim_theta)`. A single
+                parameter set of shape `(dim_theta,)` is treated as batch of size 1.
 
         Returns:
-            Posterior log probability of the theta, $-\infty$ if impossible under prior.
+            `(num_chains,)`-shaped posterior log probabilities of the theta, $-\infty$
+            if impossible under prior.
         """
         theta = torch.as_tensor(theta, dtype=torch.float32)
         theta = ensure_theta_batched(theta)
         num_batch = theta.shape[0]
-        x = ensure_x_batched(self.x).repeat(num_batch, 1)
+        # `expand` returns a view, the observation is not copied for every chain.
+        x = self.x_batched.expand(num_batch, -1)
 
         with torch.set_grad_enabled(False):
             # Evaluate on device, move back to cpu for comparison with prior.
             log_likelihood = self.likelihood_nn.log_prob(
-                inputs=x, context=theta.to(x.device)
+                inputs=x, context=self._to_device(theta)
             ).cpu()
 
         # Notice opposite sign to pyro potential.
         return log_likelihood + self.prior.log_prob(theta)
 
+    def _to_device(self, theta: Tensor) -> Tensor:
+        r"""Return batch of $\theta$ on the device of the likelihood net.
+
+        For GPUs, $\theta$ is copied into a persistent page-locked buffer, which is
+        only reallocated if more chains are evaluated than before. From there, it is
+        transferred asynchronously, without allocating pinned memory in every MCMC
+        step. The buffer can be reused in the next step because moving the
+        log-likelihood back to the cpu synchronizes with the transfer.
+        """
+        if self.device.type != "cuda":
+            return theta.to(self.device)
+
+        num_batch, dim_theta = theta.shape
+        if (
+            self._theta_buffer is None
+            or self._theta_buffer.shape[0] < num_batch
+            or self._theta_buffer.shape[1] != dim_theta
+        ):
+            self._theta_buffer = torch.empty((num_batch, dim_theta), pin_memory=True)
+
+        staged_theta = self._theta_buffer[:num_batch]
+        staged_theta.copy_(theta)
+        return staged_theta.to(self.device, non_blocking=True)
+
     def pyro_potential(self, theta: Dict[str, Tensor]) -> Tensor:
         r"""Return posterior log probability of parameters $p(\theta|x)$.
 
@@ -360,7 +410,7 @@ class PotentialFunctionProvider:
 
         # Evaluate on device, move back to cpu for comparison with prior.
         log_likelihood = self.likelihood_nn.log_prob(
-            inputs=self.x.reshape(1, -1), context=theta.reshape(1, -1).to(self.x.device)
+            inputs=self.x_batched, context=theta.reshape(1, -1).to(self.device)
         ).cpu()
 
         return -(log_likelihood + self.prior.log_prob(theta))
@@ -52,6 +52,7 @@ class RatioBasedPosterior(NeuralPosterior):
                 The following parameters are supported: `thin` to set the thinning
                 factor for the chain, `warmup_steps` to set the initial number of
                 samples to discard, `num_chains` for the number of chains,
+                `num_workers` for the number of parallel workers used by `slice_np`,
                 `init_strategy` for the initialisation strategy for chains; `prior`
                 will draw init locations from prior, whereas `sir` will use Sequential-
                 Importance-Resampling using `init_strategy_num_candidates` to find init
@@ -138,6 +139,7 @@ class RatioBasedPosterior(NeuralPosterior):
                 The following parameters are supported: `thin` to set the thinning
                 factor for the chain, `warmup_steps` to set the initial number of
                 samples to discard, `num_chains` for the number of chains,
+                `num_workers` for the number of parallel workers used by `slice_np`,
                 `init_strategy` for the initialisation strategy for chains; `prior`
                 will draw init locations from prior, whereas `sir` will use Sequential-
                 Importance-Resampling using `init_strategy_num_candidates` to find init
@@ -209,6 +211,7 @@ class RatioBasedPosterior(NeuralPosterior):
                 The following parameters are supported: `thin` to set the thinning
                 factor for the chain, `warmup_steps` to set the initial number of
                 samples to discard, `num_chains` for the number of chains,
+                `num_workers` for the number of parallel workers used by `slice_np`,
                 `init_strategy` for the initialisation strategy for chains; `prior`
                 will draw init locations from prior, whereas `sir` will use Sequential-
                 Importance-Resampling using `init_strategy_num_candidates` to find init
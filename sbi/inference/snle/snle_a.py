@@ -69,6 +69,8 @@ class SNLE_A(LikelihoodEstimator):
         retrain_from_scratch_each_round: bool = False,
         show_train_summary: bool = False,
         dataloader_kwargs: Optional[Dict] = None,
+        compile_density_estimator: bool = False,
+        mixed_precision: bool = False,
     ) -> NeuralPosterior:
         r"""
         Return density estimator that approximates the distribution $p(x|\theta)$.
@@ -76,7 +78,8 @@ class SNLE_A(LikelihoodEstimator):
         Args:
             training_batch_size: Training batch size.
             learning_rate: Learning rate for Adam optimizer.
-            validation_fraction: The fraction of data to use for validation.
+            validation_fraction: The fraction of data to use for validation. The split
+                is kept across rounds, only newly appended simulations are split.
             stop_after_epochs: The number of epochs to wait for improvement on the
                 validation set before terminating training.
             max_num_epochs: Maximum number of epochs to run. If reached, we stop
@@ -98,7 +101,16 @@ class SNLE_A(LikelihoodEstimator):
             show_train_summary: Whether to print the number of epochs and validation
                 loss and leakage after the training.
             dataloader_kwargs: Additional or updated kwargs to be passed to the training
-                and validation dataloaders (like, e.g., a collate_fn)
+                and validation dataloaders (like, e.g., a collate_fn). If None, no
+                dataloaders are used: training batches are drawn by indexing the data
+                on the device and the validation set is evaluated in large chunks.
+            compile_density_estimator: Whether to compile the density estimator with
+                `torch.compile` for training (requires PyTorch 2.0). The returned
+                density estimator is not compiled.
+            mixed_precision: Whether to evaluate the density estimator in `bfloat16`
+                autocast during training (requires PyTorch 1.10). This speeds up the
+                matrix multiplications on recent GPUs, but reduces the precision of the
+                log-probabilities. Weights, loss and optimizer state stay in `float32`.
 
         Returns:
             Density estimator that approximates the distribution $p(x|\theta)$.
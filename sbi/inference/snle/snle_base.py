@@ -3,8 +3,12 @@
 
 
 from abc import ABC
+from contextlib import nullcontext
 from copy import deepcopy
-from typing import Any, Callable, Dict, Optional, Union
+from functools import partial
+from inspect import signature
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
+from warnings import warn
 
 import torch
 from torch import Tensor, optim
@@ -76,6 +80,16 @@ class LikelihoodEstimator(NeuralInference, ABC):
         # SNLE-specific summary_writer fields.
         self._summary.update({"mcmc_times": []})  # type: ignore
 
+        # Compiled `log_prob` of `self._neural_net`, reused across rounds as long as
+        # the net is not rebuilt (see `compile_density_estimator` in `.train()`).
+        self._compiled_log_prob = None
+
+        # Number of examples in the train/validation split and the settings it was
+        # created with. The split is extended in later rounds, see
+        # `_update_train_val_split()`.
+        self._num_split_examples = 0
+        self._split_settings = None
+
     def append_simulations(
         self, theta: Tensor, x: Tensor, from_round: int = 0,
     ) -> "LikelihoodEstimator":
@@ -123,6 +137,8 @@ class LikelihoodEstimator(NeuralInference, ABC):
         retrain_from_scratch_each_round: bool = False,
         show_train_summary: bool = False,
         dataloader_kwargs: Optional[Dict] = None,
+        compile_density_estimator: bool = False,
+        mixed_precision: bool = False,
     ) -> LikelihoodBasedPosterior:
         r"""
         Train the density estimator to learn the distribution $p(x|\theta)$.
@@ -142,7 +158,16 @@ class LikelihoodEstimator(NeuralInference, ABC):
             show_train_summary: Whether to print the number of epochs and validation
                 loss after the training.
             dataloader_kwargs: Additional or updated kwargs to be passed to the training
-                and validation dataloaders (like, e.g., a collate_fn)
+                and validation dataloaders (like, e.g., a collate_fn). If None, no
+                dataloaders are used: training batches are drawn by indexing the data
+                on the device and the validation set is evaluated in large chunks.
+            compile_density_estimator: Whether to compile the density estimator with
+                `torch.compile` for training (requires PyTorch 2.0). The returned
+                density estimator is not compiled.
+            mixed_precision: Whether to evaluate the density estimator in `bfloat16`
+                autocast during training (requires PyTorch 1.10). This speeds up the
+                matrix multiplications on recent GPUs, but reduces the precision of the
+                log-probabilities. Weights, loss and optimizer state stay in `float32`.
 
         Returns:
             Density estimator that has learned the distribution $p(x|\theta)$.
@@ -158,16 +183,31 @@ class LikelihoodEstimator(NeuralInference, ABC):
             start_idx, exclude_invalid_x, warn_on_invalid=True
         )
 
-        # Dataset is shared for training and validation loaders.
-        dataset = data.TensorDataset(theta, x)
+        # Select random train and validation splits from (theta, x) pairs.
+        if not resume_training:
+            self._update_train_val_split(
+                theta.shape[0], validation_fraction, (start_idx, exclude_invalid_x)
+            )
 
-        train_loader, val_loader = self.get_dataloaders(
-            dataset,
-            training_batch_size,
-            validation_fraction,
-            resume_training,
-            dataloader_kwargs=dataloader_kwargs,
-        )
+        if dataloader_kwargs is None:
+            # Move all data to the device once. Training batches are obtained by
+            # directly indexing these tensors.
+            theta_device, x_device = theta.to(self._device), x.to(self._device)
+            theta_val = theta_device[self.val_indices.to(self._device)]
+            x_val = x_device[self.val_indices.to(self._device)]
+            train_loader, val_loader = None, None
+        else:
+            # Batches are drawn from the dataloaders and moved to the device one by
+            # one, the data is not copied to the device as a whole.
+            theta_device, x_device, theta_val, x_val = None, None, None, None
+            # The split was created above, the dataloader must not create a new one.
+            train_loader, val_loader = self.get_dataloaders(
+                data.TensorDataset(theta, x),
+                training_batch_size,
+                validation_fraction,
+                resume_training=True,
+                dataloader_kwargs=dataloader_kwargs,
+            )
 
         # First round or if retraining from scratch:
         # Call the `self._build_neural_net` with the rounds' thetas and xs as
@@ -175,18 +215,87 @@ class LikelihoodEstimator(NeuralInference, ABC):
         # This is passed into NeuralPosterior, to create a neural posterior which
         # can `sample()` and `log_prob()`. The network is accessible via `.net`.
         if self._neural_net is None or retrain_from_scratch_each_round:
+            # The net is built from the cpu data and moved to the device below.
+            train_indices = self.train_indices.cpu()
             self._neural_net = self._build_neural_net(
-                theta[self.train_indices], x[self.train_indices]
+                theta[train_indices], x[train_indices]
             )
             self._x_shape = x_shape_from_simulation(x)
             assert (
                 len(self._x_shape) < 3
             ), "SNLE cannot handle multi-dimensional simulator output."
+            # A compiled `log_prob` is bound to the previous net.
+            self._compiled_log_prob = None
 
         self._neural_net.to(self._device)
+
+        # The compiled function shares its parameters with `self._neural_net`, which
+        # stays uncompiled for building the posterior and for MCMC. On GPU,
+        # `mode="reduce-overhead"` records the forward and backward pass of the
+        # compiled `log_prob` as CUDA graphs, one per input shape, so training batches
+        # have a constant shape (hence the dropped last batch). Gradient clipping and
+        # the optimizer step are not part of the graphs and run eagerly.
+        log_prob_fn = self._neural_net.log_prob
+        mark_step_begin = None
+        if compile_density_estimator:
+            if hasattr(torch, "compile"):
+                # Compile only once per net, such that later rounds do not pay for
+                # the compilation again.
+                if self._compiled_log_prob is None:
+                    self._compiled_log_prob = torch.compile(
+                        self._neural_net.log_prob, mode="reduce-overhead"
+                    )
+                log_prob_fn = self._compiled_log_prob
+                # Signals that the outputs of the previous graph replay are no longer
+                # needed, such that the graph can be replayed for the next batch.
+                mark_step_begin = getattr(
+                    getattr(torch, "compiler", None), "cudagraph_mark_step_begin", None
+                )
+            else:
+                warn(
+                    "`compile_density_estimator=True` requires `torch.compile`, which "
+                    "is available from PyTorch 2.0 on. Training without compilation."
+                )
+
+        autocast = nullcontext
+        if mixed_precision:
+            if hasattr(torch, "autocast"):
+                autocast = partial(
+                    torch.autocast,
+                    device_type=torch.device(self._device).type,
+                    dtype=torch.bfloat16,
+                )
+            else:
+                warn(
+                    "`mixed_precision=True` requires `torch.autocast`, which is "
+                    "available from PyTorch 1.10 on. Training in full precision."
+                )
+
+        negative_one = torch.tensor(-1.0, device=self._device)
+
+        # `inference_mode` (PyTorch >= 1.9) additionally skips the bookkeeping of view
+        # and version counters. The validation log-probs are never differentiated.
+        inference_mode = getattr(torch, "inference_mode", torch.no_grad)
+
+        # Process all parameters at once instead of dispatching every parameter from
+        # Python. On GPU, Adam can update them in a single fused kernel (available
+        # from PyTorch 1.13), otherwise the multi-tensor `foreach` implementations of
+        # Adam and gradient clipping are used (available from PyTorch 1.12 and 1.13).
+        clip_kwargs = (
+            dict(foreach=True)
+            if "foreach" in signature(clip_grad_norm_).parameters
+            else {}
+        )
         if not resume_training:
+            adam_parameters = signature(optim.Adam).parameters
+            if torch.device(self._device).type == "cuda" and "fused" in adam_parameters:
+                adam_kwargs = dict(fused=True)
+            elif "foreach" in adam_parameters:
+                adam_kwargs = dict(foreach=True)
+            else:
+                adam_kwargs = {}
             self.optimizer = optim.Adam(
-                list(self._neural_net.parameters()), lr=learning_rate,
+                list(self._neural_net.parameters()), lr=learning_rate, **adam_kwargs,
             )
             self.epoch, self._val_log_prob = 0, float("-Inf")
 
@@ -196,19 +305,23 @@ class LikelihoodEstimator(NeuralInference, ABC):
 
             # Train for a single epoch.
             self._neural_net.train()
-            for batch in train_loader:
-                self.optimizer.zero_grad()
-                theta_batch, x_batch = (
-                    batch[0].to(self._device),
-                    batch[1].to(self._device),
-                )
+            for theta_batch, x_batch in self._training_batches(
+                theta_device, x_device, training_batch_size, train_loader
+            ):
+                self.optimizer.zero_grad(set_to_none=True)
+                if mark_step_begin is not None:
+                    mark_step_begin()
                 # Evaluate on x with theta as context.
-                log_prob = self._neural_net.log_prob(x_batch, context=theta_batch)
-                loss = -torch.mean(log_prob)
-                loss.backward()
+                with autocast():
+                    log_prob = log_prob_fn(x_batch, context=theta_batch)
+                # Backpropagate the loss `-mean(log_prob)` by seeding the gradient with
+                # -1 instead of building a negation node in every step.
+                torch.mean(log_prob.float()).backward(gradient=negative_one)
                 if clip_max_norm is not None:
                     clip_grad_norm_(
-                        self._neural_net.parameters(), max_norm=clip_max_norm,
+                        self._neural_net.parameters(),
+                        max_norm=clip_max_norm,
+                        **clip_kwargs,
                     )
                 self.optimizer.step()
 
@@ -216,20 +329,12 @@ class LikelihoodEstimator(NeuralInference, ABC):
 
             # Calculate validation performance.
             self._neural_net.eval()
-            log_prob_sum = 0
-            with torch.no_grad():
-                for batch in val_loader:
-                    theta_batch, x_batch = (
-                        batch[0].to(self._device),
-                        batch[1].to(self._device),
-                    )
-                    # Evaluate on x with theta as context.
-                    log_prob = self._neural_net.log_prob(x_batch, context=theta_batch)
-                    log_prob_sum += log_prob.sum().item()
-            # Take mean over all validation samples.
-            self._val_log_prob = log_prob_sum / (
-                len(val_loader) * val_loader.batch_size
-            )
+            if mark_step_begin is not None:
+                mark_step_begin()
+            with inference_mode(), autocast():
+                self._val_log_prob = self._validation_log_prob(
+                    log_prob_fn, theta_val, x_val, val_loader
+                )
             # Log validation log prob for every epoch.
             self._summary["validation_log_probs"].append(self._val_log_prob)
 
@@ -252,6 +357,141 @@ class LikelihoodEstimator(NeuralInference, ABC):
 
         return deepcopy(self._neural_net)
 
+    def _update_train_val_split(
+        self,
+        num_examples: int,
+        validation_fraction: float,
+        data_selection: Tuple[int, bool],
+    ) -> None:
+        """Set `self.train_indices` and `self.val_indices` for the next training.
+
+        The split is kept across calls to `.train()`: if simulations were appended
+        since the last split and the same data is selected for training, only the new
+        examples are split and added to the existing sets. Thereby, no re-permutation
+        of all data is needed and examples that were trained on in previous rounds do
+        not enter the validation set. The indices are created on the device, where
+        they are used to index the data.
+
+        Args:
+            num_examples: Number of (theta, x) pairs used for training and validation.
+            validation_fraction: The fraction of data to use for validation.
+            data_selection: Starting round and `exclude_invalid_x` used to obtain the
+                data. The existing split is only valid if they did not change.
+        """
+
+        split_settings = (validation_fraction, *data_selection)
+        num_split_examples = self._num_split_examples
+        if self._split_settings != split_settings or num_examples < num_split_examples:
+            num_split_examples = 0
+
+        # Split the examples that are not yet part of the training or validation set.
+        new_indices = num_split_examples + torch.randperm(
+            num_examples - num_split_examples, device=self._device
+        )
+        num_new_training_examples = int((1 - validation_fraction) * len(new_indices))
+        new_train_indices, new_val_indices = (
+            new_indices[:num_new_training_examples],
+            new_indices[num_new_training_examples:],
+        )
+
+        if num_split_examples > 0:
+            self.train_indices = torch.cat(
+                [self.train_indices.to(self._device), new_train_indices]
+            )
+            self.val_indices = torch.cat(
+                [self.val_indices.to(self._device), new_val_indices]
+            )
+        else:
+            self.train_indices, self.val_indices = new_train_indices, new_val_indices
+
+        self._num_split_examples = num_examples
+        self._split_settings = split_settings
+
+    def _training_batches(
+        self,
+        theta: Optional[Tensor],
+        x: Optional[Tensor],
+        training_batch_size: int,
+        train_loader: Optional[data.DataLoader] = None,
+    ) -> Iterator[Tuple[Tensor, Tensor]]:
+        r"""
+        Yield batches of ($\theta$, $x$) on the training device for a single epoch.
+
+        If a `train_loader` is passed (i.e. custom `dataloader_kwargs` were given),
+        batches are drawn from it. Otherwise, batches are obtained by indexing `theta`
+        and `x`, which have to live on the training device already, with a random
+        permutation of the training indices. This avoids collating single examples and
+        copying every batch to the device.
+
+        Args:
+            theta: All parameters, indexed by `self.train_indices`. Not used if a
+                `train_loader` is passed.
+            x: All simulation outputs, indexed by `self.train_indices`. Not used if a
+                `train_loader` is passed.
+            training_batch_size: Training batch size.
+            train_loader: Optional dataloader to draw the batches from instead.
+        """
+
+        if train_loader is not None:
+            for batch in train_loader:
+                yield batch[0].to(self._device), batch[1].to(self._device)
+        else:
+            num_training_examples = len(self.train_indices)
+            batch_size = min(training_batch_size, num_training_examples)
+            permuted_indices = self.train_indices.to(self._device)[
+                torch.randperm(num_training_examples, device=self._device)
+            ]
+            # Drop the last incomplete batch, as done by the dataloader.
+            for start in range(0, num_training_examples - batch_size + 1, batch_size):
+                batch_indices = permuted_indices[start : start + batch_size]
+                yield theta[batch_indices], x[batch_indices]
+
+    def _validation_log_prob(
+        self,
+        log_prob_fn: Callable,
+        theta: Optional[Tensor],
+        x: Optional[Tensor],
+        val_loader: Optional[data.DataLoader] = None,
+        chunk_size: int = 10_000,
+    ) -> float:
+        r"""
+        Return the mean log-probability of the validation set.
+
+        If a `val_loader` is passed (i.e. custom `dataloader_kwargs` were given), the
+        validation batches are drawn from it, such that they are processed as the
+        training batches. Otherwise, `theta` and `x` are evaluated in chunks of
+        `chunk_size`. The log-probabilities are summed on the device, which is
+        synchronized only once to return the mean.
+
+        Args:
+            log_prob_fn: Function evaluating the log-probability of `x` given `theta`
+                as context.
+            theta: Validation parameters on the training device. Not used if a
+                `val_loader` is passed.
+            x: Validation simulation outputs on the training device. Not used if a
+                `val_loader` is passed.
+            val_loader: Optional dataloader to draw the batches from instead.
+            chunk_size: Maximal number of examples evaluated in a single forward pass.
+        """
+
+        if val_loader is not None:
+            batches = (
+                (batch[0].to(self._device), batch[1].to(self._device))
+                for batch in val_loader
+            )
+        else:
+            batches = zip(torch.split(theta, chunk_size), torch.split(x, chunk_size))
+
+        log_prob_sum = torch.zeros((), device=self._device)
+        num_examples = 0
+        for theta_batch, x_batch in batches:
+            # Evaluate on x with theta as context.
+            log_prob = log_prob_fn(x_batch, context=theta_batch)
+            log_prob_sum += log_prob.float().sum()
+            num_examples += theta_batch.shape[0]
+
+        return (log_prob_sum / num_examples).item()
+
     def build_posterior(
         self,
         density_estimator: Optional[TorchModule] = None,
@@ -278,6 +518,7 @@ class LikelihoodEstimator(NeuralInference, ABC):
                 The following parameters are supported: `thin` to set the thinning
                 factor for the chain, `warmup_steps` to set the initial number of
                 samples to discard, `num_chains` for the number of chains,
+                `num_workers` for the number of parallel workers used by `slice_np`,
                 `init_strategy` for the initialisation strategy for chains; `prior` will
                 draw init locations from prior, whereas `sir` will use
                 Sequential-Importance-Resampling using `init_strategy_num_candidates`
@@ -100,7 +100,8 @@ class SliceSamplerVectorized:
                     )
 
             params = np.stack([sc["next_param"] for sc in self.state.values()])
-            log_probs = self._log_prob_fn(params)
+            # Evaluate all chains at once, convert to numpy once rather than per chain.
+            log_probs = np.asarray(self._log_prob_fn(params), dtype=float).reshape(-1)
 
             for c in range(self.num_chains):
                 sc = self.state[c]
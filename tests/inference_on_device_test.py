@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import pytest
+import torch
 from torch import eye, ones, zeros
 from torch.distributions import MultivariateNormal
 
@@ -16,19 +17,20 @@ from sbi.utils.torchutils import process_device
 @pytest.mark.slow
 @pytest.mark.gpu
 @pytest.mark.parametrize(
-    "method, model",
+    "method, model, mcmc_method",
     [
-        (SNPE, "mdn"),
-        (SNPE, "maf"),
-        (SNPE, "nsf"),
-        (SNLE, "maf"),
-        (SNLE, "nsf"),
-        (SNRE_A, "mlp"),
-        (SNRE_B, "resnet"),
+        (SNPE, "mdn", "slice_np"),
+        (SNPE, "maf", "slice_np"),
+        (SNPE, "maf", "slice_np_vectorized"),
+        (SNPE, "nsf", "slice_np"),
+        (SNLE, "maf", "slice"),
+        (SNLE, "nsf", "slice"),
+        (SNRE_A, "mlp", "slice_np_vectorized"),
+        (SNRE_B, "resnet", "slice_np_vectorized"),
     ],
 )
 @pytest.mark.parametrize("device", ("cpu", "cuda:0"))
-def test_training_and_mcmc_on_device(method, model, device):
+def test_training_and_mcmc_on_device(method, model, mcmc_method, device):
     """Test training on devices.
 
     This test does not check training speeds.
@@ -58,19 +60,19 @@ def test_training_and_mcmc_on_device(method, model, device):
         )
         mcmc_kwargs = dict(
             sample_with_mcmc=True,
-            mcmc_method="slice_np",
+            mcmc_method=mcmc_method,
         )
     elif method == SNLE:
         kwargs = dict(
             density_estimator=utils.likelihood_nn(model=model),
         )
-        mcmc_kwargs = dict(mcmc_method="slice")
+        mcmc_kwargs = dict(mcmc_method=mcmc_method)
     elif method in (SNRE_A, SNRE_B):
         kwargs = dict(
             classifier=utils.classifier_nn(model=model),
         )
         mcmc_kwargs = dict(
-            mcmc_method="slice_np_vectorized",
+            mcmc_method=mcmc_method,
         )
     else:
         raise ValueError()
@@ -94,6 +96,46 @@ def test_training_and_mcmc_on_device(method, model, device):
     proposals[-1].sample(sample_shape=(num_samples,), x=x_o, **mcmc_kwargs)
 
 
+@pytest.mark.slow
+@pytest.mark.gpu
+@pytest.mark.skipif(
+    not hasattr(torch, "compile"), reason="requires torch.compile (PyTorch 2.0)"
+)
+def test_compiled_snle_training_on_gpu():
+    """Test SNLE training with a compiled density estimator on the GPU.
+
+    On GPU, the compiled `log_prob` is replayed as CUDA graphs. The test trains for
+    two rounds, such that the graphs are reused with a grown training set.
+    """
+    device = process_device("cuda:0")
+
+    num_dim = 2
+    num_samples = 10
+    num_simulations = 500
+
+    x_o = zeros(1, num_dim)
+    prior = MultivariateNormal(loc=zeros(num_dim), covariance_matrix=eye(num_dim))
+
+    def simulator(theta):
+        return linear_gaussian(theta, -1.0 * ones(num_dim), 0.3 * eye(num_dim))
+
+    inferer = SNLE(prior, show_progress_bars=False, device=device)
+
+    for _ in range(2):
+        theta, x = simulate_for_sbi(simulator, prior, num_simulations=num_simulations)
+        density_estimator = inferer.append_simulations(theta, x).train(
+            training_batch_size=100,
+            max_num_epochs=5,
+            compile_density_estimator=True,
+        )
+
+    assert next(density_estimator.parameters()).device.type == device.split(":")[0]
+    posterior = inferer.build_posterior().set_default_x(x_o)
+    posterior.sample(
+        sample_shape=(num_samples,), mcmc_method="slice_np_vectorized",
+    )
+
+
 @pytest.mark.gpu
 @pytest.mark.parametrize("device", ["cpu", "gpu", "cuda", "cuda:0", "cuda:42"])
 def test_process_device(device: str):
@@ -3,12 +3,23 @@
 
 from __future__ import annotations
 
+import numpy as np
 import pytest
+import torch
 from torch import eye, ones, zeros
 from torch.distributions import MultivariateNormal
+from torch.utils.data.dataloader import default_collate
 
 from sbi import utils as utils
 from sbi.inference import SNL, prepare_for_sbi, simulate_for_sbi
+from sbi.inference.posteriors.base_posterior import (
+    ConditionalPotentialFunctionProvider,
+    RestrictedPriorForConditional,
+)
+from sbi.inference.posteriors.likelihood_based_posterior import (
+    PotentialFunctionProvider,
+)
+from sbi.mcmc import sir
 from sbi.simulators.linear_gaussian import (
     diagonal_linear_gaussian,
     linear_gaussian,
@@ -256,3 +267,342 @@ def test_api_snl_sampling_methods(mcmc_method: str, prior_str: str, set_seed):
     posterior = inference.build_posterior(mcmc_method=mcmc_method).set_default_x(x_o)
 
     posterior.sample(sample_shape=(num_samples,), x=x_o, mcmc_parameters={"thin": 3})
+
+
+@pytest.mark.parametrize("num_workers", (1, 2))
+def test_api_snl_slice_np_with_workers(num_workers: int, set_seed):
+    """Runs multiple `slice_np` chains for SNL, in parallel if `num_workers > 1`.
+
+    Args:
+        num_workers: number of parallel workers that run the chains
+        set_seed: fixture for manual seeding
+    """
+
+    num_dim = 2
+    num_samples = 10
+    num_chains = 2
+    x_o = zeros((1, num_dim))
+
+    prior = MultivariateNormal(loc=zeros(num_dim), covariance_matrix=eye(num_dim))
+
+    simulator, prior = prepare_for_sbi(diagonal_linear_gaussian, prior)
+    inference = SNL(
+        prior,
+        show_progress_bars=False,
+    )
+
+    theta, x = simulate_for_sbi(simulator, prior, 200, simulation_batch_size=50)
+    _ = inference.append_simulations(theta, x).train(max_num_epochs=5)
+    posterior = inference.build_posterior().set_default_x(x_o)
+
+    samples = posterior.sample(
+        sample_shape=(num_samples,),
+        mcmc_parameters={
+            "thin": 3,
+            "num_chains": num_chains,
+            "num_workers": num_workers,
+        },
+        show_progress_bars=False,
+    )
+
+    assert samples.shape == (num_samples, num_dim)
+
+
+def test_snl_slice_np_samples_do_not_depend_on_num_workers(set_seed):
+    """Test that parallel `slice_np` chains give the same samples as sequential ones.
+
+    Args:
+        set_seed: fixture for manual seeding
+    """
+
+    num_dim = 2
+    num_samples = 10
+    x_o = zeros((1, num_dim))
+
+    prior = MultivariateNormal(loc=zeros(num_dim), covariance_matrix=eye(num_dim))
+
+    simulator, prior = prepare_for_sbi(diagonal_linear_gaussian, prior)
+    inference = SNL(
+        prior,
+        show_progress_bars=False,
+    )
+
+    theta, x = simulate_for_sbi(simulator, prior, 200, simulation_batch_size=50)
+    _ = inference.append_simulations(theta, x).train(max_num_epochs=5)
+    posterior = inference.build_posterior().set_default_x(x_o)
+
+    samples = []
+    for num_workers in (1, 2):
+        torch.manual_seed(1)
+        np.random.seed(1)
+        samples.append(
+            posterior.sample(
+                sample_shape=(num_samples,),
+                mcmc_parameters={
+                    "thin": 3,
+                    "num_chains": 2,
+                    "num_workers": num_workers,
+                },
+                show_progress_bars=False,
+            )
+        )
+
+    assert torch.equal(samples[0], samples[1])
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(
+    not hasattr(torch, "compile"), reason="requires torch.compile (PyTorch 2.0)"
+)
+def test_snl_with_compiled_density_estimator(set_seed):
+    """Test that training compiles once across rounds and returns an uncompiled net.
+
+    Args:
+        set_seed: fixture for manual seeding
+    """
+
+    num_dim = 2
+    prior = MultivariateNormal(loc=zeros(num_dim), covariance_matrix=eye(num_dim))
+
+    simulator, prior = prepare_for_sbi(diagonal_linear_gaussian, prior)
+    inference = SNL(
+        prior,
+        show_progress_bars=False,
+    )
+
+    compiled_log_probs = []
+    for _ in range(2):
+        theta, x = simulate_for_sbi(simulator, prior, 200, simulation_batch_size=50)
+        density_estimator = inference.append_simulations(theta, x).train(
+            max_num_epochs=1, compile_density_estimator=True
+        )
+        compiled_log_probs.append(inference._compiled_log_prob)
+
+        assert isinstance(density_estimator, torch.nn.Module)
+        assert not hasattr(density_estimator, "_orig_mod")
+
+    assert compiled_log_probs[0] is not None
+    assert compiled_log_probs[0] is compiled_log_probs[1]
+    assert np.isfinite(inference._summary["validation_log_probs"]).all()
+
+
+@pytest.mark.skipif(
+    not hasattr(torch, "autocast"), reason="requires torch.autocast (PyTorch 1.10)"
+)
+def test_snl_with_mixed_precision(set_seed):
+    """Test that SNL trains in bfloat16 autocast and returns a float32 net.
+
+    Args:
+        set_seed: fixture for manual seeding
+    """
+
+    num_dim = 2
+    prior = MultivariateNormal(loc=zeros(num_dim), covariance_matrix=eye(num_dim))
+
+    simulator, prior = prepare_for_sbi(diagonal_linear_gaussian, prior)
+    inference = SNL(
+        prior,
+        show_progress_bars=False,
+    )
+
+    theta, x = simulate_for_sbi(simulator, prior, 200, simulation_batch_size=50)
+    density_estimator = inference.append_simulations(theta, x).train(
+        max_num_epochs=1, mixed_precision=True
+    )
+
+    assert all(p.dtype == torch.float32 for p in density_estimator.parameters())
+    assert np.isfinite(inference._summary["validation_log_probs"]).all()
+
+
+def test_snl_warns_without_torch_compile(set_seed, monkeypatch):
+    """Test that SNL trains uncompiled with a warning if `torch.compile` is missing.
+
+    Args:
+        set_seed: fixture for manual seeding
+        monkeypatch: fixture to remove `torch.compile`
+    """
+
+    num_dim = 2
+    prior = MultivariateNormal(loc=zeros(num_dim), covariance_matrix=eye(num_dim))
+
+    simulator, prior = prepare_for_sbi(diagonal_linear_gaussian, prior)
+    inference = SNL(
+        prior,
+        show_progress_bars=False,
+    )
+
+    theta, x = simulate_for_sbi(simulator, prior, 200, simulation_batch_size=50)
+    monkeypatch.delattr(torch, "compile", raising=False)
+    with pytest.warns(UserWarning, match="torch.compile"):
+        _ = inference.append_simulations(theta, x).train(
+            max_num_epochs=1, compile_density_estimator=True
+        )
+
+    assert inference._compiled_log_prob is None
+
+
+def test_snl_passes_dataloader_kwargs_to_validation(set_seed):
+    """Test that a custom `collate_fn` is applied to training and validation batches.
+
+    Args:
+        set_seed: fixture for manual seeding
+    """
+
+    num_dim = 2
+    prior = MultivariateNormal(loc=zeros(num_dim), covariance_matrix=eye(num_dim))
+
+    simulator, prior = prepare_for_sbi(diagonal_linear_gaussian, prior)
+    inference = SNL(
+        prior,
+        show_progress_bars=False,
+    )
+
+    batch_sizes = []
+
+    def collate_fn(batch):
+        batch_sizes.append(len(batch))
+        return default_collate(batch)
+
+    theta, x = simulate_for_sbi(simulator, prior, 200, simulation_batch_size=50)
+    _ = inference.append_simulations(theta, x).train(
+        training_batch_size=50,
+        max_num_epochs=1,
+        dataloader_kwargs=dict(collate_fn=collate_fn),
+    )
+
+    # 180 training examples in 3 full batches of 50 and 20 validation examples.
+    assert sum(batch_sizes) == inference._summary["epochs"][-1] * (150 + 20)
+
+
+def test_snl_conditional_potential_on_batches(set_seed):
+    """Test the conditional numpy potential on a batch of chains and for SIR init.
+
+    Args:
+        set_seed: fixture for manual seeding
+    """
+
+    num_dim = 3
+    num_chains = 4
+    dims_to_sample = [0, 2]
+    x_o = zeros((1, num_dim))
+
+    prior = MultivariateNormal(loc=zeros(num_dim), covariance_matrix=eye(num_dim))
+
+    simulator, prior = prepare_for_sbi(diagonal_linear_gaussian, prior)
+    inference = SNL(
+        prior,
+        show_progress_bars=False,
+    )
+
+    theta, x = simulate_for_sbi(simulator, prior, 200, simulation_batch_size=50)
+    density_estimator = inference.append_simulations(theta, x).train(
+        max_num_epochs=1
+    )
+
+    condition = prior.sample()
+    potential_fn = ConditionalPotentialFunctionProvider(
+        PotentialFunctionProvider(), condition, dims_to_sample
+    )(prior, density_estimator, x_o, "slice_np")
+
+    theta_free = prior.sample((num_chains,))[:, dims_to_sample]
+    batched_potentials = potential_fn(theta_free.numpy())
+    single_potentials = torch.cat([potential_fn(t.numpy()) for t in theta_free])
+
+    assert batched_potentials.shape == (num_chains,)
+    assert torch.allclose(batched_potentials, single_potentials, atol=1e-5)
+
+    init_params = sir(
+        RestrictedPriorForConditional(prior, dims_to_sample),
+        potential_fn,
+        sir_num_batches=2,
+        sir_batch_size=10,
+    )
+
+    assert init_params.shape == (1, len(dims_to_sample))
+
+
+def test_snl_dataloaders_match_incremental_split(set_seed):
+    """Test that the dataloaders yield batches for a split extended across rounds.
+
+    Each round's training share is floored separately, such that the split can have
+    fewer training examples than `(1 - validation_fraction)` of all simulations.
+
+    Args:
+        set_seed: fixture for manual seeding
+    """
+
+    num_dim = 2
+    prior = MultivariateNormal(loc=zeros(num_dim), covariance_matrix=eye(num_dim))
+
+    simulator, prior = prepare_for_sbi(diagonal_linear_gaussian, prior)
+    inference = SNL(
+        prior,
+        show_progress_bars=False,
+    )
+
+    batch_sizes = []
+
+    def collate_fn(batch):
+        batch_sizes.append(len(batch))
+        return default_collate(batch)
+
+    for round_ in range(2):
+        theta, x = simulate_for_sbi(simulator, prior, 15)
+        _ = inference.append_simulations(theta, x, from_round=round_).train(
+            training_batch_size=27,
+            max_num_epochs=1,
+            dataloader_kwargs=dict(collate_fn=collate_fn),
+        )
+
+    # 2 x 13 training examples, although `int(0.9 * 30) = 27`.
+    assert len(inference.train_indices) == 26
+    assert 26 in batch_sizes
+
+
+def test_snl_keeps_train_val_split_across_rounds(set_seed):
+    """Test that SNL only splits newly appended simulations in later rounds.
+
+    The split is created anew if the validation fraction or the selected data change.
+
+    Args:
+        set_seed: fixture for manual seeding
+    """
+
+    num_dim = 2
+    prior = MultivariateNormal(loc=zeros(num_dim), covariance_matrix=eye(num_dim))
+
+    simulator, prior = prepare_for_sbi(diagonal_linear_gaussian, prior)
+    inference = SNL(
+        prior,
+        show_progress_bars=False,
+    )
+
+    theta, x = simulate_for_sbi(simulator, prior, 200, simulation_batch_size=50)
+    _ = inference.append_simulations(theta, x).train(max_num_epochs=1)
+    train_indices, val_indices = inference.train_indices, inference.val_indices
+
+    theta, x = simulate_for_sbi(simulator, prior, 200, simulation_batch_size=50)
+    _ = inference.append_simulations(theta, x, from_round=1).train(max_num_epochs=1)
+
+    assert (inference.train_indices[: len(train_indices)] == train_indices).all()
+    assert (inference.val_indices[: len(val_indices)] == val_indices).all()
+    assert len(inference.train_indices) + len(inference.val_indices) == 400
+    # New indices are drawn only from the newly appended simulations.
+    assert (inference.train_indices[len(train_indices) :] >= 200).all()
+    assert (inference.val_indices[len(val_indices) :] >= 200).all()
+
+    # A different validation fraction requires a new split of all simulations.
+    _ = inference.train(max_num_epochs=1, validation_fraction=0.2)
+    assert len(inference.train_indices) == 320
+    assert len(inference.val_indices) == 80
+
+    # Discarding the prior samples changes the data, which is split anew as well.
+    _ = inference.train(
+        max_num_epochs=1, validation_fraction=0.2, discard_prior_samples=True
+    )
+    assert len(inference.train_indices) == 160
+    assert len(inference.val_indices) == 40
+    assert (
+        torch.sort(torch.cat([inference.train_indices, inference.val_indices]))[0]
+        == torch.arange(200)
+    ).all()